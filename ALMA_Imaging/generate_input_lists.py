@@ -2,8 +2,24 @@
 
 import argparse
 import glob
+import itertools
 import tarfile
 import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# Local data paths under LOCAL_PREFIX are served over OSDF from OSDF_PREFIX
+LOCAL_PREFIX = '/home/srikrishna.sekhar/data/data/'
+OSDF_PREFIX = 'osdf:///path-facility/data/srikrishna.sekhar/data/'
+
+def make_tar(input_files, tar_file):
+    """
+    Write the input files into an uncompressed tarball. Streaming mode avoids
+    tarfile keeping a member list in memory for very large chunks.
+    """
+    with tarfile.open(tar_file, 'w|') as tar:
+        for input_file in input_files:
+            tar.add(input_file)
+    return tar_file
 
 def generate_input_files():
     """
@@ -15,7 +31,7 @@ def generate_input_files():
     """
 
     parser = argparse.ArgumentParser(description='Generate input files for HTCondor job submission.')
-    parser.add_argument('infiles', nargs='*', help='List of files to process')
+    parser.add_argument('infiles', nargs='*', help='List of files to process, or a single directory containing them')
     parser.add_argument('breadth', type=int, help='Number of concurrent jobs to submit')
     parser.add_argument('-o', '--outfile', help='Output file to write the input files to.', default='input_files.txt')
     parser.add_argument('-d', '--outdir', help='Output directory to write the outfile and optional tarball.', default='input_files.txt')
@@ -31,8 +47,22 @@ def generate_input_files():
     do_tar = args.tar
     do_force = args.force
 
-    # Get all the files in the data directory
-    infiles = sorted(infiles)
+    # Get all the files in the data directory, along with their sizes
+    if len(infiles) == 1 and os.path.isdir(infiles[0]):
+        # DirEntry caches its stat result, so each file is only stat-ed once.
+        # Like a shell glob, take only regular files and skip hidden entries
+        with os.scandir(infiles[0]) as it:
+            entries = [(entry.path, entry.stat().st_size) for entry in it
+                       if entry.is_file() and not entry.name.startswith('.')]
+    else:
+        # stat() is latency bound on networked filesystems, so issue them in parallel
+        with ThreadPoolExecutor(32) as executor:
+            entries = list(zip(infiles, executor.map(os.path.getsize, infiles)))
+
+    entries.sort()
+    infiles = [path for path, _ in entries]
+    # Running total of the sizes, so each chunk's size is a single subtraction
+    cumulative_size = list(itertools.accumulate((size for _, size in entries), initial=0))
     num_files = len(infiles)
     stride = int(round(num_files/breadth))
     nstep = len(range(0, num_files, stride))
@@ -42,13 +72,14 @@ def generate_input_files():
 
     output_file = os.path.join(output_dir, os.path.basename(output_file))
 
+    # Chunks are independent, so their tarballs are built in parallel afterwards
+    tar_jobs = []
+
     with open(output_file, 'w') as f:
-        total_size = 0
         for idx, ii in enumerate(range(0, num_files, stride)):
-            input_files = infiles[ii:ii+stride]
-            input_files = [os.path.abspath(x) for x in input_files]
-            total_size = sum([os.path.getsize(x) for x in input_files])
-            input_files = [x.replace('/home/srikrishna.sekhar/data/data/', 'osdf:///path-facility/data/srikrishna.sekhar/data/') for x in input_files]
+            local_files = [os.path.abspath(x) for x in infiles[ii:ii+stride]]
+            chunk_size = cumulative_size[min(ii+stride, num_files)] - cumulative_size[ii]
+            input_files = [OSDF_PREFIX + x[len(LOCAL_PREFIX):] if x.startswith(LOCAL_PREFIX) else x for x in local_files]
             f.write(','.join(input_files) + '\n')
 
             if do_tar:
@@ -58,13 +89,16 @@ def generate_input_files():
                     print(f"tarball {tar_file} exists. Skipping.")
                     continue
 
-                print(f"Creating tarball {tar_file}")
-                with tarfile.open(tar_file, 'w') as tar:
-                    [tar.add(input_file) for input_file in input_files]
+                tar_jobs.append((local_files, tar_file))
+
+            if idx == 0 or idx == nstep - 1:
+                print(f"For chunk{idx} total size is {chunk_size/1e9} GB; Total files are {len(input_files)}.")
+                print(f"Memory footprint to request is {2.5 * chunk_size/1e9} GB (fudge factor of 2.5)")
 
-            if idx == 0 or idx == num_files - 1:
-                print(f"For chunk{idx} total size is {total_size/1e9} GB; Total files are {len(input_files)}.")
-                print(f"Memory footprint to request is {2.5 * total_size/1e9} GB (fudge factor of 2.5)")
+    if tar_jobs:
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            for tar_file in executor.map(make_tar, *zip(*tar_jobs)):
+                print(f"Created tarball {tar_file}")
 
 
 if __name__ == '__main__':
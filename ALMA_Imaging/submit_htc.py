@@ -12,10 +12,14 @@ niter               	 = '100000'
 usemask             	 = 'auto-multithresh'
 threshold           	 = '2mJy'
 
-with open('input_files.txt', 'r') as fptr:
-    input_data = fptr.readlines()
-
-itemdata = [{'input_data':inpdat} for inpdat in input_data]
+def _items(path):
+    # Stream the queue items rather than reading them all in; trailing
+    # newlines would otherwise leak into the arguments and transfer list
+    with open(path, 'r') as fptr:
+        for line in fptr:
+            line = line.rstrip('\n')
+            if line:
+                yield {'input_data':line}
 
 # Interact with the scheduler
 schedd = htcondor.Schedd()
@@ -38,7 +42,7 @@ job_def = htcondor.Submit({"SingularityImage" : "osdf:///path-facility/data/srik
         })
 
 # Submit job
-job = schedd.submit(job_def, itemdata = iter(itemdata))
+job = schedd.submit(job_def, itemdata = _items('input_files.txt'))
 
 job_id = job.cluster()
 with open('job_id.txt', 'w') as fptr:
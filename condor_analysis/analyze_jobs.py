@@ -12,7 +12,7 @@ This script:
 3. Saves all outputs in a directory named after the job ID
 
 Usage:
-    python analyze_jobs.py <json_file> [--output-dir OUTPUT_DIR] [--overwrite-parquet]
+    python analyze_jobs.py <json_file> [--output-dir OUTPUT_DIR] [--overwrite-parquet] [--isolated]
 
 Examples:
     # Auto-detect job ID from filename (e.g., condor_history_944143.json -> 944143/)
@@ -23,11 +23,16 @@ Examples:
 
     # Force regenerate parquet from JSON
     python analyze_jobs.py condor_history.json --overwrite-parquet
+
+    # Run each step as a separate script (slower, but isolates failures)
+    python analyze_jobs.py condor_history.json --isolated
 """
 
 import argparse
 import subprocess
 import sys
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import re
 
@@ -61,21 +66,53 @@ def run_command(cmd, description):
     Returns:
         True if successful, False otherwise
     """
-    print(f"\n{'='*60}")
-    print(f"{description}")
-    print(f"{'='*60}")
-    print(f"Command: {' '.join(cmd)}\n")
+    # Output is collected and printed in one go, so that concurrently running
+    # commands do not interleave their output
+    lines = [
+        f"\n{'='*60}",
+        f"{description}",
+        f"{'='*60}",
+        f"Command: {' '.join(cmd)}\n",
+    ]
 
     try:
         result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-        print(result.stdout)
+        lines.append(result.stdout)
         if result.stderr:
-            print(result.stderr)
+            lines.append(result.stderr)
+        lines.append(f"✓ {description} completed successfully")
+        success = True
+    except subprocess.CalledProcessError as e:
+        lines.append(f"✗ {description} failed!")
+        lines.append(f"Error output:\n{e.stderr}")
+        success = False
+
+    print('\n'.join(lines))
+    return success
+
+
+def run_step(description, func):
+    """
+    Run an analysis step in-process and print status.
+
+    Args:
+        description: Description of what the step does
+        func: Callable taking no arguments that performs the step
+
+    Returns:
+        True if successful, False otherwise
+    """
+    print(f"\n{'='*60}")
+    print(f"{description}")
+    print(f"{'='*60}\n")
+
+    try:
+        func()
         print(f"✓ {description} completed successfully")
         return True
-    except subprocess.CalledProcessError as e:
+    except Exception:
         print(f"✗ {description} failed!")
-        print(f"Error output:\n{e.stderr}")
+        print(f"Error output:\n{traceback.format_exc()}")
         return False
 
 
@@ -114,6 +151,11 @@ def main():
         action='store_true',
         help='Force overwrite of existing parquet file (default: skip if exists)'
     )
+    parser.add_argument(
+        '--isolated',
+        action='store_true',
+        help='Run each step as a separate script instead of in-process (default: in-process)'
+    )
 
     args = parser.parse_args()
 
@@ -152,73 +194,120 @@ def main():
     # Track success of each step
     all_success = True
 
+    python_cmd = ['micromamba', 'run', '-n', 'py312', 'python']
+
     # Step 1: Convert JSON to parquet
+    df = None
     if parquet_file.exists() and not args.overwrite_parquet:
         print(f"\n{'='*60}")
         print("Step 1: Parquet file already exists, skipping conversion")
         print(f"{'='*60}")
         print(f"Using existing: {parquet_file}")
         print(f"(Use --overwrite-parquet to force regeneration)")
-    else:
-        cmd = [
-            'micromamba', 'run', '-n', 'py312', 'python',
+    elif args.isolated:
+        cmd = python_cmd + [
             str(script_dir / 'condor_to_parquet.py'),
             str(json_path),
             '--output', str(parquet_file)
         ]
         if not run_command(cmd, "Step 1: Converting JSON to parquet"):
             return 1
+    else:
+        from condor_to_parquet import (parse_condor_history, compute_statistics, print_statistics,
+                                       save_parquet, save_statistics)
+
+        def convert():
+            nonlocal df
+            df = parse_condor_history(json_path)
+            if len(df) == 0:
+                raise ValueError("No job data found in JSON file")
+            stats = compute_statistics(df)
+            print_statistics(stats)
+            save_parquet(df, parquet_file)
+            save_statistics(stats, parquet_file)
+
+        if not run_step("Step 1: Converting JSON to parquet", convert):
+            return 1
 
-    # Step 2: Generate completion curve
-    cmd = [
-        'micromamba', 'run', '-n', 'py312', 'python',
-        str(script_dir / 'plot_completion_curve.py'),
-        str(parquet_file),
-        '--output', str(completion_curve)
+    # Load the parquet once and share it between all the plotting steps
+    if not args.isolated:
+        import pandas as pd
+        from plot_completion_curve import plot_completion_curve
+        from plot_gantt_phases import plot_gantt_phases
+        from plot_duration_histograms import plot_duration_histograms
+        from plot_concurrent_jobs import plot_concurrent_jobs
+
+        if df is None:
+            df = pd.read_parquet(parquet_file)
+
+    # Steps 2-5: each step is run either in-process on the shared DataFrame, or
+    # as a separate script on the parquet file when --isolated
+    plot_steps = [
+        {
+            'description': "Step 2: Generating completion curve",
+            'script': 'plot_completion_curve.py',
+            'output': completion_curve,
+            'args': [],
+            'plot': lambda: plot_completion_curve(df, str(completion_curve)),
+        },
+        {
+            # Gantt chart is optional
+            'description': "Step 3: Generating phase breakdown Gantt chart",
+            'skip': None if args.gantt else "Step 3: Skipping Gantt chart generation (use --gantt to enable)",
+            'script': 'plot_gantt_phases.py',
+            'output': gantt_phases,
+            'args': ['--use-datetime'] + (['--jobs', str(args.gantt_jobs)] if args.gantt_jobs else []),
+            'plot': lambda: plot_gantt_phases(df, str(gantt_phases), args.gantt_jobs, xaxis='datetime'),
+        },
+        {
+            'description': "Step 4: Generating duration histograms",
+            'script': 'plot_duration_histograms.py',
+            'output': duration_histograms,
+            'args': [],
+            'plot': lambda: plot_duration_histograms(df, str(duration_histograms)),
+        },
+        {
+            'description': "Step 5: Generating concurrent jobs plot",
+            'script': 'plot_concurrent_jobs.py',
+            'output': concurrent_jobs,
+            'args': ['--resolution', str(args.resolution)],
+            'plot': lambda: plot_concurrent_jobs(df, str(concurrent_jobs), args.resolution),
+        },
     ]
-    if not run_command(cmd, "Step 2: Generating completion curve"):
-        all_success = False
 
-    # Step 3: Generate Gantt chart (optional)
-    gantt_generated = False
-    if args.gantt:
-        cmd = [
-            'micromamba', 'run', '-n', 'py312', 'python',
-            str(script_dir / 'plot_gantt_phases.py'),
-            str(parquet_file),
-            '--output', str(gantt_phases)
-        ]
-        if args.gantt_jobs:
-            cmd.extend(['--jobs', str(args.gantt_jobs)])
-        if not run_command(cmd, "Step 3: Generating phase breakdown Gantt chart"):
-            all_success = False
+    def run_plot_step(step):
+        if args.isolated:
+            cmd = python_cmd + [
+                str(script_dir / step['script']),
+                str(parquet_file),
+                '--output', str(step['output'])
+            ] + step['args']
+            return run_command(cmd, step['description'])
+        return run_step(step['description'], step['plot'])
+
+    active_steps = []
+    for step in plot_steps:
+        if step.get('skip'):
+            print(f"\n{'='*60}")
+            print(step['skip'])
+            print(f"{'='*60}")
         else:
-            gantt_generated = True
+            active_steps.append(step)
+
+    if args.isolated:
+        # Each plot script writes its own output file, so the subprocesses can
+        # run concurrently. In-process steps stay serial as pyplot is not thread-safe.
+        with ThreadPoolExecutor(max_workers=len(active_steps)) as executor:
+            results = list(executor.map(run_plot_step, active_steps))
     else:
-        print(f"\n{'='*60}")
-        print("Step 3: Skipping Gantt chart generation (use --gantt to enable)")
-        print(f"{'='*60}")
+        results = [run_plot_step(step) for step in active_steps]
 
-    # Step 4: Generate duration histograms
-    cmd = [
-        'micromamba', 'run', '-n', 'py312', 'python',
-        str(script_dir / 'plot_duration_histograms.py'),
-        str(parquet_file),
-        '--output', str(duration_histograms)
-    ]
-    if not run_command(cmd, "Step 4: Generating duration histograms"):
-        all_success = False
-
-    # Step 5: Generate concurrent jobs plot
-    cmd = [
-        'micromamba', 'run', '-n', 'py312', 'python',
-        str(script_dir / 'plot_concurrent_jobs.py'),
-        str(parquet_file),
-        '--output', str(concurrent_jobs),
-        '--resolution', str(args.resolution)
-    ]
-    if not run_command(cmd, "Step 5: Generating concurrent jobs plot"):
-        all_success = False
+    gantt_generated = False
+    for step, success in zip(active_steps, results):
+        if not success:
+            all_success = False
+        elif step['output'] == gantt_phases:
+            gantt_generated = True
 
     # Summary
     print(f"\n{'='*60}")
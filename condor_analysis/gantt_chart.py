@@ -10,6 +10,9 @@ This script visualizes HTCondor job execution timelines with three phases:
 
 Colors use the colorblind-friendly Okabe-Ito palette.
 
+The parsed job data is cached next to the JSON file as <json_file>.parquet
+and reused on later runs until the JSON file changes.
+
 Usage:
     python gantt_chart.py <json_file> [--output OUTPUT_HTML]
 
@@ -17,19 +20,116 @@ Example:
     python gantt_chart.py condor_history_944143.json --output gantt_chart.html
 """
 
-import json
+import os
+import array
 import argparse
-from datetime import datetime
 from pathlib import Path
 import pandas as pd
 import numpy as np
 import holoviews as hv
 from holoviews import opts
+from bokeh.models import CustomJSHover
+
+from condor_to_parquet import load_json, to_local_datetime
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import datashader
+    from holoviews.operation.datashader import datashade
+except ImportError:
+    datashader = None
 
 # Enable Bokeh backend
 hv.extension('bokeh')
 
 
+# With ijson installed, files at least this large are streamed job by job
+STREAM_THRESHOLD_BYTES = 1 << 30
+
+# Per-job timestamp attributes used to build the phases
+TIMESTAMP_FIELDS = (
+    'JobCurrentStartTransferInputDate',
+    'JobCurrentFinishTransferInputDate',
+    'JobCurrentStartTransferOutputDate',
+    'JobCurrentFinishTransferOutputDate',
+    'CompletionDate',
+)
+
+# Job phases, in plotting order
+PHASES = ['Input Transfer', 'Job Execution', 'Output Transfer']
+
+# Colorblind-friendly Okabe-Ito palette
+PHASE_COLORS = {
+    'Input Transfer': '#0173B2',   # Blue
+    'Job Execution': '#029E73',     # Teal/Bluish-green
+    'Output Transfer': '#ECB01F',   # Yellow/Gold
+}
+FAILED_COLOR = '#DE4A3E'  # Vermillion
+
+# Hover formatter showing the uint8 failed code as Yes/No
+FAILED_HOVER_JS = "return value ? 'Yes' : 'No'"
+
+# Above this many phase records the chart is rasterized with datashader, if available
+RASTER_THRESHOLD = 50_000
+
+
+def _job_id(job, key):
+    """Integer ID field of a job, -1 where it is missing or null."""
+    value = job.get(key)
+    return -1 if value is None else value
+
+
+def _load_columns(json_file):
+    """
+    Load the whole history file and pull out the per-job fields as arrays.
+    """
+    data = load_json(json_file)
+
+    def timestamps(key):
+        # Missing or zero timestamps become NaN
+        return np.fromiter((job.get(key) or np.nan for job in data), dtype=np.float64, count=len(data))
+
+    def ids(key):
+        # Missing or null IDs become -1
+        return np.fromiter((_job_id(job, key) for job in data), dtype=np.int64, count=len(data))
+
+    columns = {key: timestamps(key) for key in TIMESTAMP_FIELDS}
+    columns['ProcId'] = ids('ProcId')
+    columns['ClusterId'] = ids('ClusterId')
+    columns['JobStatus'] = np.array([job.get('JobStatus', 0) for job in data], dtype=np.float64)
+    columns['ExitCode'] = np.array([job.get('ExitCode', 0) for job in data], dtype=np.float64)
+    return columns
+
+
+def _stream_columns(json_file):
+    """
+    Stream the history file one job at a time with ijson, appending the
+    per-job fields to growable typed buffers. Peak memory then scales with
+    the extracted columns rather than with the size of the JSON file.
+    """
+    ids = {key: array.array('q') for key in ('ProcId', 'ClusterId')}
+    floats = {key: array.array('d') for key in ('JobStatus', 'ExitCode') + TIMESTAMP_FIELDS}
+
+    with open(json_file, 'rb') as f:
+        for job in ijson.items(f, 'item', use_float=True):
+            for key, buf in ids.items():
+                buf.append(_job_id(job, key))
+            for key in ('JobStatus', 'ExitCode'):
+                value = job.get(key, 0)
+                floats[key].append(np.nan if value is None else value)
+            for key in TIMESTAMP_FIELDS:
+                # Missing or zero timestamps become NaN
+                floats[key].append(job.get(key) or np.nan)
+
+    columns = {key: np.frombuffer(buf, dtype=np.int64) for key, buf in ids.items()}
+    columns.update({key: np.frombuffer(buf, dtype=np.float64) for key, buf in floats.items()})
+    return columns
+
+
 def parse_condor_history(json_file):
     """
     Parse HTCondor history JSON file and extract job timing data.
@@ -42,81 +142,96 @@ def parse_condor_history(json_file):
     """
     print(f"Parsing {json_file}...")
 
-    with open(json_file, 'r') as f:
-        data = json.load(f)
-
-    records = []
-
-    for job in data:
-        proc_id = job.get('ProcId')
-        cluster_id = job.get('ClusterId')
-        job_status = job.get('JobStatus', 0)
-        exit_code = job.get('ExitCode', 0)
-
-        # Determine if job failed (JobStatus != 4 or ExitCode != 0)
-        failed = (job_status != 4) or (exit_code != 0)
-
-        # Extract timestamps
-        input_start = job.get('JobCurrentStartTransferInputDate')
-        input_end = job.get('JobCurrentFinishTransferInputDate')
-        output_start = job.get('JobCurrentStartTransferOutputDate')
-        output_end = job.get('JobCurrentFinishTransferOutputDate')
-        completion_date = job.get('CompletionDate')
-
-        # Input Transfer phase
-        if input_start and input_end:
-            records.append({
-                'job_id': proc_id,
-                'cluster_id': cluster_id,
-                'phase': 'Input Transfer',
-                'start_time': datetime.fromtimestamp(input_start),
-                'end_time': datetime.fromtimestamp(input_end),
-                'duration': input_end - input_start,
-                'failed': failed
-            })
-
-        # Job Execution phase
-        if input_end and output_start:
-            records.append({
-                'job_id': proc_id,
-                'cluster_id': cluster_id,
-                'phase': 'Job Execution',
-                'start_time': datetime.fromtimestamp(input_end),
-                'end_time': datetime.fromtimestamp(output_start),
-                'duration': output_start - input_end,
-                'failed': failed
-            })
-
-        # Output Transfer phase
-        if output_start and output_end:
-            records.append({
-                'job_id': proc_id,
-                'cluster_id': cluster_id,
-                'phase': 'Output Transfer',
-                'start_time': datetime.fromtimestamp(output_start),
-                'end_time': datetime.fromtimestamp(output_end),
-                'duration': output_end - output_start,
-                'failed': failed
-            })
-        elif failed and output_start and completion_date:
-            # For failed jobs, use completion date as end time
-            records.append({
-                'job_id': proc_id,
-                'cluster_id': cluster_id,
-                'phase': 'Output Transfer',
-                'start_time': datetime.fromtimestamp(output_start),
-                'end_time': datetime.fromtimestamp(completion_date),
-                'duration': completion_date - output_start,
-                'failed': failed
-            })
-
-    df = pd.DataFrame(records)
-
-    print(f"Parsed {len(df)} phase records from {len(data)} jobs")
+    if ijson is not None and os.path.getsize(json_file) >= STREAM_THRESHOLD_BYTES:
+        columns = _stream_columns(json_file)
+    else:
+        columns = _load_columns(json_file)
+
+    num_jobs = len(columns['ProcId'])
+    proc_ids = columns['ProcId']
+    cluster_ids = columns['ClusterId']
+    job_status = columns['JobStatus']
+    exit_code = columns['ExitCode']
+
+    # Determine if job failed (JobStatus != 4 or ExitCode != 0)
+    failed = (job_status != 4) | (exit_code != 0)
+
+    # Extract timestamps
+    input_start = columns['JobCurrentStartTransferInputDate']
+    input_end = columns['JobCurrentFinishTransferInputDate']
+    output_start = columns['JobCurrentStartTransferOutputDate']
+    output_end = columns['JobCurrentFinishTransferOutputDate']
+    completion_date = columns['CompletionDate']
+
+    # For failed jobs without an output transfer end, use completion date as end time
+    output_end = np.where(np.isnan(output_end) & failed, completion_date, output_end)
+
+    phases = [
+        ('Input Transfer', input_start, input_end),
+        ('Job Execution', input_end, output_start),
+        ('Output Transfer', output_start, output_end),
+    ]
+
+    masks = [~np.isnan(start) & ~np.isnan(end) for _, start, end in phases]
+    starts = np.concatenate([start[mask] for (_, start, _), mask in zip(phases, masks)])
+    ends = np.concatenate([end[mask] for (_, _, end), mask in zip(phases, masks)])
+    counts = [np.count_nonzero(mask) for mask in masks]
+
+    # Convert every start and end timestamp in a single vectorized call
+    times = to_local_datetime(np.concatenate([starts, ends]))
+
+    # Compact dtypes: one byte per failed flag, and phase codes instead of repeated strings
+    df = pd.DataFrame({
+        'job_id': np.concatenate([proc_ids[mask] for mask in masks]),
+        'cluster_id': np.concatenate([cluster_ids[mask] for mask in masks]),
+        'phase': pd.Categorical.from_codes(np.repeat(np.arange(len(PHASES), dtype=np.int8), counts), categories=PHASES),
+        'start_time': times[:len(starts)],
+        'end_time': times[len(starts):],
+        'duration': ends - starts,
+        'failed': np.concatenate([failed[mask] for mask in masks]).astype(np.bool_)
+    })
+
+    print(f"Parsed {len(df)} phase records from {num_jobs} jobs")
 
     return df
 
 
+def _cache_path(json_file):
+    """Path of the parsed-history cache written next to a JSON file."""
+    return Path(f"{json_file}.parquet")
+
+
+def load_cached_history(json_file):
+    """
+    Load the parsed job timing data cached for a JSON file, if it is still valid.
+
+    The cache is only used if it is at least as new as the JSON file, and an
+    unreadable (corrupt or partly written) cache is ignored.
+
+    Returns:
+        pandas.DataFrame as returned by parse_condor_history, or None if there is no valid cache
+    """
+    cache_path = _cache_path(json_file)
+    if not cache_path.exists() or cache_path.stat().st_mtime < Path(json_file).stat().st_mtime:
+        return None
+
+    print(f"Loading cached job data from {cache_path}...")
+    try:
+        return pd.read_parquet(cache_path, engine='pyarrow')
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read cache {cache_path}, parsing the JSON instead: {e}")
+        return None
+
+
+def save_cached_history(df, json_file):
+    """Cache the parsed job timing data next to its JSON file, if that location is writable."""
+    cache_path = _cache_path(json_file)
+    try:
+        df.to_parquet(cache_path, engine='pyarrow', compression='snappy')
+    except OSError as e:
+        print(f"Warning: Could not write cache {cache_path}: {e}")
+
+
 def print_statistics(df):
     """Print summary statistics about the job history."""
     total_jobs = df['job_id'].nunique()
@@ -132,11 +247,9 @@ def print_statistics(df):
 
     # Average phase durations
     print("Average Phase Durations:")
-    for phase in ['Input Transfer', 'Job Execution', 'Output Transfer']:
-        phase_df = df[df['phase'] == phase]
-        if len(phase_df) > 0:
-            avg_duration = phase_df['duration'].mean()
-            print(f"  {phase}: {avg_duration:.1f} seconds ({avg_duration/60:.1f} minutes)")
+    avg_durations = df.groupby('phase', observed=True)['duration'].mean()
+    for phase, avg_duration in avg_durations.items():
+        print(f"  {phase}: {avg_duration:.1f} seconds ({avg_duration/60:.1f} minutes)")
 
     print("=" * 60 + "\n")
 
@@ -149,64 +262,63 @@ def create_gantt_chart(df, output_file='gantt_chart.html'):
         df: pandas.DataFrame with job timing data
         output_file: Path to output HTML file
     """
+    if len(df) > RASTER_THRESHOLD and datashader is not None:
+        return create_raster_gantt_chart(df, output_file)
+
     print(f"Creating Gantt chart...")
 
-    # Define color mapping using colorblind-friendly Okabe-Ito palette
-    color_map = {
-        'Input Transfer': '#0173B2',   # Blue
-        'Job Execution': '#029E73',     # Teal/Bluish-green
-        'Output Transfer': '#ECB01F',   # Yellow/Gold
-    }
+    color_map = PHASE_COLORS
 
     # Create list of rectangle objects grouped by phase
     overlays = []
 
-    for phase in ['Input Transfer', 'Job Execution', 'Output Transfer']:
-        phase_df = df[df['phase'] == phase].copy()
+    # Split the table by phase in a single grouping pass
+    groups = dict(list(df.groupby('phase', sort=False, observed=True)))
+
+    for phase in PHASES:
+        phase_df = groups.get(phase)
 
-        if len(phase_df) == 0:
+        if phase_df is None or len(phase_df) == 0:
             continue
 
-        # Prepare rectangle data: (x0, y0, x1, y1)
-        rectangles = []
-        for _, row in phase_df.iterrows():
-            color = '#DE4A3E' if row['failed'] else color_map[phase]  # Vermillion for failed
-            rectangles.append({
-                'x0': row['start_time'],
-                'y0': row['job_id'] - 0.45,
-                'x1': row['end_time'],
-                'y1': row['job_id'] + 0.45,
-                'job_id': row['job_id'],
-                'cluster_id': row['cluster_id'],
-                'phase': row['phase'],
-                'duration': row['duration'],
-                'failed': 'Yes' if row['failed'] else 'No',
-                'color': color
-            })
-
-        rect_df = pd.DataFrame(rectangles)
+        # Prepare rectangle data as columns: (x0, y0, x1, y1)
+        job_ids = phase_df['job_id'].values
+        rect_data = {
+            'x0': phase_df['start_time'].values,
+            'y0': job_ids - 0.45,
+            'x1': phase_df['end_time'].values,
+            'y1': job_ids + 0.45,
+            'job_id': job_ids,
+            'cluster_id': phase_df['cluster_id'].values,
+            'duration': phase_df['duration'].values,
+            'failed_code': phase_df['failed'].values.astype(np.uint8)
+        }
 
         # Create rectangles with proper vdims for hover tooltips
         rects = hv.Rectangles(
-            rect_df,
+            rect_data,
             kdims=['x0', 'y0', 'x1', 'y1'],
-            vdims=['job_id', 'cluster_id', 'phase', 'duration', 'failed', 'color'],
+            vdims=['job_id', 'cluster_id', 'duration', 'failed_code'],
             label=phase
         )
 
         # Apply styling
         rects = rects.opts(
-            color='color',
-            line_color='color',
+            color='failed_code',
+            line_color='failed_code',
+            cmap=[color_map[phase], FAILED_COLOR],
+            clim=(0, 1),
             alpha=0.8,
             tools=['hover'],
             hover_tooltips=[
                 ('Job ID', '@job_id'),
                 ('Cluster', '@cluster_id'),
-                ('Phase', '@phase'),
+                ('Phase', phase),
                 ('Duration', '@duration{0.1f} sec'),
-                ('Failed', '@failed')
-            ]
+                ('Failed', '@failed_code{custom}')
+            ],
+            # HoloViews writes the field as @{failed_code} in the tooltip template
+            hover_formatters={'@{failed_code}': CustomJSHover(code=FAILED_HOVER_JS)}
         )
 
         overlays.append(rects)
@@ -235,6 +347,68 @@ def create_gantt_chart(df, output_file='gantt_chart.html'):
     print(f"Gantt chart saved to: {output_file}")
 
 
+def create_raster_gantt_chart(df, output_file='gantt_chart.html'):
+    """
+    Create a Gantt chart for very large histories as a datashader image.
+
+    Bokeh serializes every rectangle into the HTML, which stalls the browser
+    for tens of thousands of bars. Here the bars are aggregated into a fixed
+    size image instead, so the output stays small regardless of job count.
+    Each job row is far thinner than a pixel at this scale, so bars are
+    drawn as horizontal segments. Hover tooltips are not available.
+
+    Args:
+        df: pandas.DataFrame with job timing data
+        output_file: Path to output HTML file
+    """
+    print(f"Creating rasterized Gantt chart for {len(df)} phase records...")
+
+    # Failed jobs get their own category so they are shaded vermillion
+    categories = PHASES + ['Failed']
+    codes = np.where(df['failed'].values, len(PHASES), df['phase'].cat.codes.values)
+    segments = hv.Segments(
+        pd.DataFrame({
+            'x0': df['start_time'].values,
+            'y0': df['job_id'].values,
+            'x1': df['end_time'].values,
+            'y1': df['job_id'].values,
+            'category': pd.Categorical.from_codes(codes, categories=categories),
+        }),
+        kdims=['x0', 'y0', 'x1', 'y1'],
+        vdims=['category']
+    )
+
+    color_key = dict(PHASE_COLORS, Failed=FAILED_COLOR)
+    image = datashade(
+        segments,
+        aggregator=datashader.count_cat('category'),
+        color_key=color_key,
+        width=1000,
+        height=700,
+        dynamic=False
+    )
+
+    # Empty elements only to provide legend entries for the image
+    legend = [hv.Rectangles([], label=name).opts(color=color) for name, color in color_key.items()]
+
+    chart = hv.Overlay([image] + legend).opts(
+        opts.Overlay(
+            width=1000,
+            height=700,
+            xlabel='Time',
+            ylabel='Job ID (ProcId)',
+            title='HTCondor Job Execution Timeline',
+            legend_position='right',
+            show_legend=True,
+            toolbar='above',
+            xformatter='%Y-%m-%d %H:%M'
+        )
+    )
+
+    hv.save(chart, output_file, backend='bokeh')
+    print(f"Gantt chart saved to: {output_file}")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Generate interactive Gantt charts from HTCondor job history JSON files'
@@ -259,8 +433,11 @@ def main():
         print(f"Error: File not found: {args.json_file}")
         return 1
 
-    # Parse job history
-    df = parse_condor_history(args.json_file)
+    # Parse job history, reusing the cached parse when the JSON is unchanged
+    df = load_cached_history(args.json_file)
+    if df is None:
+        df = parse_condor_history(args.json_file)
+        save_cached_history(df, args.json_file)
 
     if len(df) == 0:
         print("Error: No job data found in JSON file")
@@ -8,7 +8,8 @@ This script creates a Gantt chart visualization showing the three phases of job
 - Output Transfer (orange)
 
 Usage:
-    python plot_gantt_phases.py <parquet_file> [--output OUTPUT_PDF] [--jobs N] [--job-range START END]
+    python plot_gantt_phases.py <parquet_file> [--output OUTPUT_FILE] [--format {pdf,svgz,png}]
+                                [--jobs N] [--job-range START END] [--max-render N] [--use-datetime]
 
 Examples:
     # Plot all jobs to PDF (default)
@@ -17,276 +18,372 @@ Examples:
     # Plot with custom output filename
     python plot_gantt_phases.py condor_jobs.parquet --output my_gantt.pdf
 
+    # Write gzip-compressed SVG instead of PDF (PNG is the default above 100000 jobs)
+    python plot_gantt_phases.py condor_jobs.parquet --format svgz
+
     # Plot first 100 jobs
     python plot_gantt_phases.py condor_jobs.parquet --jobs 100
 
     # Plot specific job range
     python plot_gantt_phases.py condor_jobs.parquet --job-range 0 200
+
+    # Draw every job of a large run instead of subsampling to at most 5000
+    python plot_gantt_phases.py condor_jobs.parquet --max-render 0
+
+    # Plot against clock time instead of minutes from start
+    python plot_gantt_phases.py condor_jobs.parquet --use-datetime
 """
 
 import argparse
+import gzip
+import sys
 from pathlib import Path
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from matplotlib.patches import Rectangle
 from datetime import datetime
 import numpy as np
-
-
-def plot_gantt_phases(df, output_file='gantt_phases.pdf', max_jobs=None, job_range=None):
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# Job phases: (name, legend label, start column, end column, color)
+PHASES = [
+    ('input', 'Input Transfer', 'input_start_time', 'input_end_time', '#1f77b4'),         # Blue
+    ('execution', 'Job Execution', 'input_end_time', 'output_start_time', '#2ca02c'),     # Green
+    ('output', 'Output Transfer', 'output_start_time', 'output_end_time', '#ff7f0e'),     # Orange
+]
+
+# Columns bounding the phases
+PHASE_COLUMNS = ['input_start_time', 'input_end_time', 'output_start_time', 'output_end_time']
+
+# Timing columns read from the parquet file for the chart
+REQUIRED_COLUMNS = ['job_start_time'] + PHASE_COLUMNS
+
+# Supported output formats; without --format or --output, selections of more
+# than PNG_THRESHOLD jobs are written as PNG rather than PDF
+OUTPUT_FORMATS = ['pdf', 'svgz', 'png']
+PNG_THRESHOLD = 100_000
+
+# Figure and axes reused by every plot_gantt_phases call, so running it as a
+# library over many files sets up the figure only once
+_FIG = None
+_AX = None
+
+
+if njit is not None:
+    @njit(cache=True, parallel=True)
+    def _build_bars(bounds, start_rows, end_rows, nat, out_start, out_end, out_valid):
+        """
+        Fill phase-major bar slots in one pass: slot p*n + i holds phase p of
+        job i, flagged valid when both times are present and it has a
+        positive duration.
+        """
+        n = bounds.shape[1]
+        for i in prange(n):
+            for p in range(len(start_rows)):
+                start = bounds[start_rows[p], i]
+                end = bounds[end_rows[p], i]
+                out_start[p*n + i] = start
+                out_end[p*n + i] = end
+                out_valid[p*n + i] = start != nat and end != nat and end > start
+else:
+    _build_bars = None
+
+
+def _phase_intervals(times):
     """
-    Create a Gantt chart showing job phases.
+    Compute the positive-duration phase intervals of every job at once.
 
     Args:
-        df: pandas.DataFrame with timing columns
-        output_file: Path to output image file
-        max_jobs: Maximum number of jobs to plot (from start)
-        job_range: Tuple of (start_idx, end_idx) for job range to plot
-    """
-    print(f"Creating phase breakdown Gantt chart...")
+        times: dict of datetime64[ns] arrays for the four phase boundary
+            columns, one element per plotted job in plotting order
 
-    # Filter jobs based on parameters
-    if job_range:
-        start_idx, end_idx = job_range
-        df_plot = df.iloc[start_idx:end_idx].copy()
-        print(f"Plotting jobs {start_idx} to {end_idx} ({len(df_plot)} jobs)")
-    elif max_jobs:
-        df_plot = df.head(max_jobs).copy()
-        print(f"Plotting first {len(df_plot)} jobs")
-    else:
-        df_plot = df.copy()
-        print(f"Plotting all {len(df_plot)} jobs")
+    Returns:
+        Tuple of (y positions, start and end times as matplotlib date numbers,
+        durations in seconds, int8 index into PHASES), ordered by phase and
+        then by job
+    """
+    import matplotlib.dates as mdates
 
-    # Sort by job start time for better visualization
-    df_plot = df_plot.sort_values('job_start_time').reset_index(drop=True)
-
-    # Create figure
-    fig, ax = plt.subplots(figsize=(14, max(8, len(df_plot) * 0.05)))
-
-    # Define phase colors
-    colors = {
-        'input': '#1f77b4',   # Blue
-        'execution': '#2ca02c',  # Green
-        'output': '#ff7f0e'   # Orange
-    }
-
-    # Track phases for statistics
-    phase_stats = {
-        'input': [],
-        'execution': [],
-        'output': []
-    }
-
-    # Plot each job's phases
-    for idx, row in df_plot.iterrows():
-        y_pos = idx
-
-        # Input Transfer phase
-        if pd.notna(row['input_start_time']) and pd.notna(row['input_end_time']):
-            start = row['input_start_time']
-            end = row['input_end_time']
-            duration = (end - start).total_seconds()
-            if duration > 0:  # Only plot positive durations
-                ax.barh(y_pos, duration/60, left=mdates.date2num(start)*24*60,
-                       height=0.8, color=colors['input'], alpha=0.8)
-                phase_stats['input'].append(duration)
-
-        # Job Execution phase
-        if pd.notna(row['input_end_time']) and pd.notna(row['output_start_time']):
-            start = row['input_end_time']
-            end = row['output_start_time']
-            duration = (end - start).total_seconds()
-            if duration > 0:  # Only plot positive durations
-                ax.barh(y_pos, duration/60, left=mdates.date2num(start)*24*60,
-                       height=0.8, color=colors['execution'], alpha=0.8)
-                phase_stats['execution'].append(duration)
-
-        # Output Transfer phase
-        if pd.notna(row['output_start_time']) and pd.notna(row['output_end_time']):
-            start = row['output_start_time']
-            end = row['output_end_time']
-            duration = (end - start).total_seconds()
-            if duration > 0:  # Only plot positive durations
-                ax.barh(y_pos, duration/60, left=mdates.date2num(start)*24*60,
-                       height=0.8, color=colors['output'], alpha=0.8)
-                phase_stats['output'].append(duration)
-
-    # Calculate statistics
-    print("\nPhase Duration Statistics (seconds):")
-    for phase, durations in phase_stats.items():
-        if durations:
-            avg = np.mean(durations)
-            median = np.median(durations)
-            print(f"  {phase.capitalize():10s}: mean={avg:.1f}s, median={median:.1f}s")
+    n = len(times['input_start_time'])
 
-    # Format x-axis
-    # Convert to datetime for proper formatting
-    ax.set_xlim(left=0)  # Will be auto-adjusted
+    # int64 nanoseconds, one row per column, with NaT (the minimum int64) marking missing times
+    nat = np.iinfo(np.int64).min
+    bounds = np.stack([times[col].view('i8') for col in PHASE_COLUMNS])
+    start_rows = np.array([PHASE_COLUMNS.index(start_col) for _, _, start_col, _, _ in PHASES])
+    end_rows = np.array([PHASE_COLUMNS.index(end_col) for _, _, _, end_col, _ in PHASES])
 
-    # Labels and title
-    ax.set_xlabel('Time (minutes from start)', fontsize=12)
-    ax.set_ylabel('Job Index', fontsize=12)
-    ax.set_title('HTCondor Job Phase Breakdown', fontsize=14, fontweight='bold')
-
-    # Y-axis
-    ax.set_ylim(-0.5, len(df_plot) - 0.5)
-    if len(df_plot) <= 50:
-        ax.set_yticks(range(0, len(df_plot), max(1, len(df_plot)//20)))
+    if _build_bars is not None:
+        start = np.empty(len(PHASES) * n, dtype=np.int64)
+        end = np.empty(len(PHASES) * n, dtype=np.int64)
+        valid = np.empty(len(PHASES) * n, dtype=np.bool_)
+        _build_bars(bounds, start_rows, end_rows, nat, start, end, valid)
     else:
-        ax.set_yticks(range(0, len(df_plot), max(1, len(df_plot)//10)))
+        start = bounds[start_rows].ravel()
+        end = bounds[end_rows].ravel()
+        valid = (start != nat) & (end != nat) & (end > start)
 
-    # Legend
-    from matplotlib.patches import Patch
-    legend_elements = [
-        Patch(facecolor=colors['input'], alpha=0.8, label='Input Transfer'),
-        Patch(facecolor=colors['execution'], alpha=0.8, label='Job Execution'),
-        Patch(facecolor=colors['output'], alpha=0.8, label='Output Transfer')
-    ]
-    ax.legend(handles=legend_elements, loc='upper right', fontsize=10)
-
-    # Grid
-    ax.grid(True, alpha=0.3, linestyle='--', axis='x')
-
-    # Tight layout
-    plt.tight_layout()
+    # Only plot phases with both times present and a positive duration
+    start = start[valid]
+    end = end[valid]
+    y_pos = np.tile(np.arange(n), len(PHASES))[valid]
+    phase_idx = np.repeat(np.arange(len(PHASES), dtype=np.int8), n)[valid]
 
-    # Save figure as PDF (vector format, infinitely scalable)
-    plt.savefig(output_file, format='pdf', bbox_inches='tight')
-    print(f"\nPlot saved to: {output_file} (PDF - vector format, infinitely scalable)")
+    duration = (end - start) * 1e-9
+    start_days = mdates.date2num(start.view('datetime64[ns]'))
+    end_days = mdates.date2num(end.view('datetime64[ns]'))
+    return y_pos, start_days, end_days, duration, phase_idx
 
-    # Close figure to free memory
-    plt.close(fig)
 
-
-def plot_gantt_phases_datetime(df, output_file='gantt_phases.pdf', max_jobs=None, job_range=None):
+def _bar_collection(left, width, y_pos, colors, height=0.8):
+    """
+    Build all bars as a single PolyCollection, so matplotlib draws one
+    artist instead of one Rectangle per bar.
     """
-    Create a Gantt chart showing job phases with datetime x-axis.
+    from matplotlib.collections import PolyCollection
+
+    x0 = left
+    x1 = left + width
+    y0 = y_pos - height / 2
+    y1 = y_pos + height / 2
+
+    # (N bars, 4 corners, xy)
+    verts = np.empty((len(left), 4, 2))
+    verts[:, 0, 0] = x0
+    verts[:, 0, 1] = y0
+    verts[:, 1, 0] = x0
+    verts[:, 1, 1] = y1
+    verts[:, 2, 0] = x1
+    verts[:, 2, 1] = y1
+    verts[:, 3, 0] = x1
+    verts[:, 3, 1] = y0
+    bars = PolyCollection(verts, facecolors=colors, edgecolors='none', alpha=0.8)
+
+    # Store the dense bar layer as an image rather than thousands of vector paths
+    bars.set_rasterized(True)
+
+    # Like barh, do not pad the axis beyond the left edge of the bars
+    bars.sticky_edges.x.append(x0.min())
+    return bars
+
+
+def plot_gantt_phases(df, output_file='gantt_phases.pdf', max_jobs=None, job_range=None, xaxis='datetime',
+                      max_render=5000, output_format=None):
+    """
+    Create a Gantt chart showing job phases.
 
     Args:
         df: pandas.DataFrame with timing columns
         output_file: Path to output image file
         max_jobs: Maximum number of jobs to plot (from start)
         job_range: Tuple of (start_idx, end_idx) for job range to plot
+        xaxis: 'datetime' for clock time, or 'minutes' for minutes from the first phase start
+        max_render: Draw at most this many jobs, taking every n-th job of larger
+            selections (statistics still use every job); None or 0 draws all jobs
+        output_format: 'pdf', 'svgz' or 'png'; None takes it from the output file
+            extension, falling back to PDF
     """
     print(f"Creating phase breakdown Gantt chart...")
 
-    # Filter jobs based on parameters
+    # Filter jobs based on parameters (row slices are views, nothing is copied)
     if job_range:
         start_idx, end_idx = job_range
-        df_plot = df.iloc[start_idx:end_idx].copy()
+        df_plot = df.iloc[start_idx:end_idx]
         print(f"Plotting jobs {start_idx} to {end_idx} ({len(df_plot)} jobs)")
     elif max_jobs:
-        df_plot = df.head(max_jobs).copy()
+        df_plot = df.iloc[:max_jobs]
         print(f"Plotting first {len(df_plot)} jobs")
     else:
-        df_plot = df.copy()
+        df_plot = df
         print(f"Plotting all {len(df_plot)} jobs")
+    num_jobs = len(df_plot)
+
+    # Check for something to draw before paying for matplotlib and a figure
+    if num_jobs == 0:
+        print("Warning: No jobs selected, skipping plot")
+        return
+    empty_cols = [col for col in REQUIRED_COLUMNS if df_plot[col].isna().all()]
+    if empty_cols:
+        print(f"Warning: No times recorded in {empty_cols}, skipping plot")
+        return
+
+    # Sort by job start time for better visualization, argsorting the int64
+    # nanosecond key (missing times last) and gathering only the phase columns
+    start_time = df_plot['job_start_time'].to_numpy(dtype='datetime64[ns]')
+    key = start_time.view('i8').copy()
+    key[np.isnat(start_time)] = np.iinfo(np.int64).max
+    order = np.argsort(key, kind='stable')
+    times = {col: df_plot[col].to_numpy(dtype='datetime64[ns]')[order] for col in PHASE_COLUMNS}
+    del df_plot
+
+    # Imported here so --help and failed validation never load matplotlib
+    import matplotlib.dates as mdates
+    from matplotlib.artist import setp
+    from matplotlib.colors import to_rgba_array
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Patch
 
-    # Sort by job start time for better visualization
-    df_plot = df_plot.sort_values('job_start_time').reset_index(drop=True)
-
-    # Create figure
-    fig, ax = plt.subplots(figsize=(14, max(8, len(df_plot) * 0.05)))
-
-    # Define phase colors
-    colors = {
-        'input': '#1f77b4',   # Blue
-        'execution': '#2ca02c',  # Green
-        'output': '#ff7f0e'   # Orange
-    }
-
-    # Track phases for statistics
-    phase_stats = {
-        'input': [],
-        'execution': [],
-        'output': []
-    }
-
-    # Plot each job's phases
-    for idx, row in df_plot.iterrows():
-        y_pos = idx
-
-        # Input Transfer phase
-        if pd.notna(row['input_start_time']) and pd.notna(row['input_end_time']):
-            start = row['input_start_time']
-            end = row['input_end_time']
-            duration = (end - start).total_seconds()
-            if duration > 0:  # Only plot positive durations
-                width = mdates.date2num(end) - mdates.date2num(start)
-                ax.barh(y_pos, width, left=mdates.date2num(start),
-                       height=0.8, color=colors['input'], alpha=0.8)
-                phase_stats['input'].append(duration)
-
-        # Job Execution phase
-        if pd.notna(row['input_end_time']) and pd.notna(row['output_start_time']):
-            start = row['input_end_time']
-            end = row['output_start_time']
-            duration = (end - start).total_seconds()
-            if duration > 0:  # Only plot positive durations
-                width = mdates.date2num(end) - mdates.date2num(start)
-                ax.barh(y_pos, width, left=mdates.date2num(start),
-                       height=0.8, color=colors['execution'], alpha=0.8)
-                phase_stats['execution'].append(duration)
-
-        # Output Transfer phase
-        if pd.notna(row['output_start_time']) and pd.notna(row['output_end_time']):
-            start = row['output_start_time']
-            end = row['output_end_time']
-            duration = (end - start).total_seconds()
-            if duration > 0:  # Only plot positive durations
-                width = mdates.date2num(end) - mdates.date2num(start)
-                ax.barh(y_pos, width, left=mdates.date2num(start),
-                       height=0.8, color=colors['output'], alpha=0.8)
-                phase_stats['output'].append(duration)
-
-    # Calculate statistics
-    print("\nPhase Duration Statistics (seconds):")
-    for phase, durations in phase_stats.items():
-        if durations:
-            avg = np.mean(durations)
-            median = np.median(durations)
-            print(f"  {phase.capitalize():10s}: mean={avg:.1f}s, median={median:.1f}s")
-
-    # Format x-axis for datetime
-    ax.xaxis_date()
-    ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
-    ax.xaxis.set_major_locator(mdates.AutoDateLocator())
-    plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
+    # Size the figure, capped in height so very long runs stay a manageable size.
+    # It is created outside pyplot (files only, no interactive display), so the
+    # cached figure never becomes another caller's current figure
+    global _FIG, _AX
+    figsize = (14, min(40, max(8, num_jobs * 0.05)))
+    if _FIG is None:
+        _FIG = Figure(figsize=figsize)
+        _AX = _FIG.add_subplot()
+    else:
+        # Also drops anything left over from a call that failed before saving
+        _AX.clear()
+        _FIG.set_size_inches(figsize)
+    fig, ax = _FIG, _AX
+
+    # Vectorized phase intervals for every job
+    intervals = _phase_intervals(times)
+
+    # Beyond a few thousand rows bars are thinner than a pixel, so only every
+    # n-th job is drawn, with its bar stretched to cover the skipped rows after it
+    stride = 1
+    if max_render and num_jobs > max_render:
+        stride = -(-num_jobs // max_render)
+    if stride > 1:
+        print(f"Warning: drawing every {stride}th of {num_jobs} jobs (--max-render {max_render})")
+
+    y_pos, start, end, duration, phase_idx = intervals
+    if xaxis == 'minutes':
+        origin = start.min() if len(start) else 0.0
+
+    # All phases go into one collection, colored by indexing an RGBA palette with their PHASES index
+    drawn = y_pos % stride == 0
+    if drawn.any():
+        left = start[drawn]
+        bar_y = y_pos[drawn] + (stride - 1) / 2
+        palette = to_rgba_array([color for _, _, _, _, color in PHASES])
+        colors = palette[phase_idx[drawn]]
+        if xaxis == 'minutes':
+            ax.add_collection(_bar_collection((left - origin)*24*60, duration[drawn]/60,
+                                              bar_y, colors, 0.8*stride))
+        else:
+            ax.add_collection(_bar_collection(left, end[drawn] - left,
+                                              bar_y, colors, 0.8*stride))
+
+    # Mean and median per phase; durations are stored phase by phase
+    counts = np.bincount(phase_idx, minlength=len(PHASES))
+    phase_stats = {}
+    for (phase, _, _, _, _), phase_duration in zip(PHASES, np.split(duration, np.cumsum(counts)[:-1])):
+        if len(phase_duration):
+            phase_stats[phase] = (float(phase_duration.mean()), float(np.median(phase_duration)))
+    ax.autoscale_view()
+
+    # Print statistics as one table in a single write
+    lines = ["\nPhase Duration Statistics (seconds):"]
+    lines += [f"  {phase.capitalize():10s}: mean={avg:.1f}s, median={median:.1f}s"
+              for phase, (avg, median) in phase_stats.items()]
+    sys.stdout.write("\n".join(lines) + "\n")
+
+    # Format x-axis
+    if xaxis == 'minutes':
+        ax.set_xlim(left=0)
+        ax.set_xlabel('Time (minutes from start)', fontsize=12)
+    else:
+        ax.xaxis_date()
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
+        ax.xaxis.set_major_locator(mdates.AutoDateLocator())
+        setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
+        ax.set_xlabel('Time', fontsize=12)
 
     # Labels and title
-    ax.set_xlabel('Time', fontsize=12)
     ax.set_ylabel('Job Index', fontsize=12)
     ax.set_title('HTCondor Job Phase Breakdown', fontsize=14, fontweight='bold')
 
     # Y-axis
-    ax.set_ylim(-0.5, len(df_plot) - 0.5)
-    if len(df_plot) <= 50:
-        ax.set_yticks(range(0, len(df_plot), max(1, len(df_plot)//20)))
+    ax.set_ylim(-0.5, num_jobs - 0.5)
+    if num_jobs <= 50:
+        ax.set_yticks(range(0, num_jobs, max(1, num_jobs//20)))
     else:
-        ax.set_yticks(range(0, len(df_plot), max(1, len(df_plot)//10)))
+        ax.set_yticks(range(0, num_jobs, max(1, num_jobs//10)))
 
     # Legend
-    from matplotlib.patches import Patch
-    legend_elements = [
-        Patch(facecolor=colors['input'], alpha=0.8, label='Input Transfer'),
-        Patch(facecolor=colors['execution'], alpha=0.8, label='Job Execution'),
-        Patch(facecolor=colors['output'], alpha=0.8, label='Output Transfer')
-    ]
+    legend_elements = [Patch(facecolor=color, alpha=0.8, label=label) for _, label, _, _, color in PHASES]
     ax.legend(handles=legend_elements, loc='upper right', fontsize=10)
 
     # Grid
     ax.grid(True, alpha=0.3, linestyle='--', axis='x')
 
-    # Tight layout
-    plt.tight_layout()
+    # Fixed margins (in inches, whatever the figure height) instead of
+    # tight_layout and bbox_inches='tight', which each cost an extra render pass
+    height = fig.get_figheight()
+    fig.subplots_adjust(left=0.08, right=0.98, bottom=1.0 / height, top=1 - 0.5 / height)
+
+    if output_format is None:
+        suffix = Path(output_file).suffix.lstrip('.').lower()
+        output_format = suffix if suffix in OUTPUT_FORMATS else 'pdf'
+
+    # Save figure (in PDF and SVG the axes, labels and legend stay vector; the bars are rasterized)
+    if output_format == 'svgz':
+        with gzip.open(output_file, 'wb') as f:
+            fig.savefig(f, format='svg', dpi=200)
+    elif output_format == 'png':
+        fig.savefig(output_file, format='png', dpi=150)
+    else:
+        fig.savefig(output_file, format='pdf', dpi=200, metadata={'Producer': ''})
+    print(f"\nPlot saved to: {output_file}")
+
+    # Clear the axes for the next call, freeing the bars
+    ax.clear()
+
 
-    # Save figure as PDF (vector format, infinitely scalable)
-    plt.savefig(output_file, format='pdf', bbox_inches='tight')
-    print(f"\nPlot saved to: {output_file} (PDF - vector format, infinitely scalable)")
+def read_jobs(parquet_file, max_jobs=None, job_range=None):
+    """
+    Read the timing columns of the selected jobs from a parquet file.
 
-    # Close figure to free memory
-    plt.close(fig)
+    Only the row groups overlapping the selection are read, so plotting the
+    first few jobs or a small range of a large file does not load all of it.
+
+    Args:
+        parquet_file: Path to HTCondor jobs parquet file
+        max_jobs: Maximum number of jobs to read (from start)
+        job_range: Tuple of (start_idx, end_idx) for job range to read
+
+    Returns:
+        pandas.DataFrame with the REQUIRED_COLUMNS of the selected jobs
+    """
+    pf = pq.ParquetFile(parquet_file)
+    schema = pa.schema([pf.schema_arrow.field(col) for col in REQUIRED_COLUMNS])
+
+    if job_range:
+        # Normalise the range the same way iloc slicing would
+        rows = range(pf.metadata.num_rows)[job_range[0]:job_range[1]]
+        start, stop = rows.start, max(rows.start, rows.stop)
+
+        # Pick the row groups that overlap [start, stop)
+        sizes = [pf.metadata.row_group(i).num_rows for i in range(pf.num_row_groups)]
+        offsets = np.concatenate([[0], np.cumsum(sizes)])
+        groups = [i for i in range(pf.num_row_groups)
+                  if start < stop and offsets[i] < stop and offsets[i + 1] > start]
+        if not groups:
+            return schema.empty_table().to_pandas()
+
+        table = pf.read_row_groups(groups, columns=REQUIRED_COLUMNS)
+        print(f"Read jobs {start} to {stop} from {len(groups)} of {pf.num_row_groups} row groups")
+        return table.slice(start - offsets[groups[0]], stop - start).to_pandas()
+
+    if max_jobs:
+        # Stop reading once enough jobs have been collected
+        batches = []
+        num_rows = 0
+        for batch in pf.iter_batches(batch_size=64_000, columns=REQUIRED_COLUMNS):
+            batches.append(batch)
+            num_rows += batch.num_rows
+            if num_rows >= max_jobs:
+                break
+        table = pa.Table.from_batches(batches, schema=schema)
+        print(f"Read first {min(num_rows, max_jobs)} jobs")
+        return table.slice(0, max_jobs).to_pandas()
+
+    return pd.read_parquet(parquet_file, columns=REQUIRED_COLUMNS, engine='pyarrow')
 
 
 def main():
@@ -301,8 +398,12 @@ def main():
     parser.add_argument(
         '--output',
         type=str,
-        default='gantt_phases.pdf',
-        help='Output PDF file path (default: gantt_phases.pdf)'
+        help='Output file path (default: gantt_phases.<format>)'
+    )
+    parser.add_argument(
+        '--format',
+        choices=OUTPUT_FORMATS,
+        help=f'Output format (default: from the --output extension, else pdf, or png above {PNG_THRESHOLD} jobs)'
     )
     parser.add_argument(
         '--jobs',
@@ -316,6 +417,12 @@ def main():
         metavar=('START', 'END'),
         help='Plot specific job range (start and end indices)'
     )
+    parser.add_argument(
+        '--max-render',
+        type=int,
+        default=5000,
+        help='Draw at most this many jobs, subsampling larger selections; 0 draws all (default: 5000)'
+    )
     parser.add_argument(
         '--use-datetime',
         action='store_true',
@@ -324,33 +431,49 @@ def main():
 
     args = parser.parse_args()
 
+    if args.max_render < 0:
+        print(f"Error: --max-render must be 0 or positive, got {args.max_render}")
+        return 1
+
     # Validate input file
     parquet_path = Path(args.parquet_file)
     if not parquet_path.exists():
         print(f"Error: File not found: {args.parquet_file}")
         return 1
 
-    # Load parquet file
+    # Validate required columns from the parquet footer before reading any data
+    schema = pq.read_schema(args.parquet_file)
+    available_cols = schema.names
+    missing_cols = [col for col in REQUIRED_COLUMNS if col not in available_cols]
+    if missing_cols:
+        print(f"Error: Missing required columns: {missing_cols}")
+        print(f"Available columns: {available_cols}")
+        return 1
+
+    # The phase arithmetic works on timestamp columns only
+    bad_types = {col: str(schema.field(col).type) for col in REQUIRED_COLUMNS
+                 if not pa.types.is_timestamp(schema.field(col).type)}
+    if bad_types:
+        print(f"Error: Required columns are not timestamps: {bad_types}")
+        return 1
+
+    # Load only the columns, and as far as possible only the rows, the chart uses
     print(f"Loading {args.parquet_file}...")
-    df = pd.read_parquet(args.parquet_file)
+    df = read_jobs(args.parquet_file, args.jobs, tuple(args.job_range) if args.job_range else None)
 
     if len(df) == 0:
         print("Error: No data found in parquet file")
         return 1
 
-    # Validate required columns
-    required_cols = ['input_start_time', 'input_end_time', 'output_start_time', 'output_end_time']
-    missing_cols = [col for col in required_cols if col not in df.columns]
-    if missing_cols:
-        print(f"Error: Missing required columns: {missing_cols}")
-        print(f"Available columns: {list(df.columns)}")
-        return 1
+    # Large selections default to PNG, which stays small and fast to open
+    output_format = args.format
+    if output_format is None and args.output is None:
+        output_format = 'png' if len(df) > PNG_THRESHOLD else 'pdf'
+    output_file = args.output or f'gantt_phases.{output_format}'
 
-    # Create plot
-    if args.use_datetime:
-        plot_gantt_phases_datetime(df, args.output, args.jobs, tuple(args.job_range) if args.job_range else None)
-    else:
-        plot_gantt_phases_datetime(df, args.output, args.jobs, tuple(args.job_range) if args.job_range else None)
+    # Create plot (the job selection has already been applied while reading)
+    plot_gantt_phases(df, output_file, xaxis='datetime' if args.use_datetime else 'minutes',
+                      max_render=args.max_render, output_format=output_format)
 
     return 0
 